@@ -1,68 +1,54 @@
 from tokenizer import tokenize
-from parser import parse
+from parser import parse, Num, BinOp
 
 printed_string = None
 
+BINARY_OPS = frozenset(("+","-","*","/"))
+
 def evaluate(ast):
     global printed_string
     printed_string = None
-    if ast["tag"] == "print":
-        value = evaluate(ast["value"])
+    if ast.tag == "print":
+        value = evaluate(ast.value)
         s = str(value)
         printed_string = s
         print(s)
-    if ast["tag"] == "number":
-        return ast["value"]
-    if ast["tag"] in ["+","-","*","/"]:
-        left_value = evaluate(ast["left"])
-        right_value = evaluate(ast["right"])
-        if ast["tag"] == "+":
+    if ast.tag == "number":
+        return ast.value
+    if ast.tag in BINARY_OPS:
+        left_value = evaluate(ast.left)
+        right_value = evaluate(ast.right)
+        if ast.tag == "+":
             return left_value + right_value
-        if ast["tag"] == "-":
+        if ast.tag == "-":
             return left_value - right_value
-        if ast["tag"] == "*":
+        if ast.tag == "*":
             return left_value * right_value
-        if ast["tag"] == "/":
+        if ast.tag == "/":
             return left_value / right_value
 
 def test_evaluate_number():
     print("testing evaluate number")
-    assert evaluate({"tag":"number","value":4}) == 4
+    assert evaluate(Num(4)) == 4
 
 def test_evaluate_addition():
     print("testing evaluate addition")
-    ast = {
-        "tag":"+",
-        "left":{"tag":"number","value":1},
-        "right":{"tag":"number","value":3}
-        }
+    ast = BinOp("+", Num(1), Num(3))
     assert evaluate(ast) == 4
 
 def test_evaluate_subtraction():
     print("testing evaluate subtraction")
-    ast = {
-        "tag":"-",
-        "left":{"tag":"number","value":3},
-        "right":{"tag":"number","value":2}
-        }
+    ast = BinOp("-", Num(3), Num(2))
     assert evaluate(ast) == 1
 
 def test_evaluate_multiplication():
     print("testing evaluate multiplication")
-    ast = {
-        "tag":"*",
-        "left":{"tag":"number","value":3},
-        "right":{"tag":"number","value":2}
-        }
+    ast = BinOp("*", Num(3), Num(2))
     assert evaluate(ast) == 6
 
 def test_evaluate_division():
     print("testing evaluate division")
-    ast = {
-        "tag":"/",
-        "left":{"tag":"number","value":4},
-        "right":{"tag":"number","value":2}
-        }
+    ast = BinOp("/", Num(4), Num(2))
     assert evaluate(ast) == 2
 
 def eval(s):
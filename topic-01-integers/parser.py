@@ -1,9 +1,12 @@
-from tokenizer import tokenize
+from dataclasses import dataclass
+from typing import ClassVar
+
+from tokenizer import tokenize, TAG, VALUE, POS
 
 """
 parser.py -- implement parser for simple expressions
 
-Accept a string of tokens, return an AST expressed as stack of dictionaries
+Accept a string of tokens, return an AST expressed as a tree of nodes
 """
 
 ebnf = """
@@ -31,21 +34,45 @@ bnf = """
     statement = expression
 """
 
-def parse_factor(tokens):
+# AST nodes; every node has a .tag the evaluator dispatches on
+
+# frozen, since parse_factor shares the small-integer instances
+@dataclass(slots=True, frozen=True)
+class Num:
+    tag: ClassVar[str] = "number"
+    value: int | float
+
+@dataclass(slots=True)
+class BinOp:
+    tag: str
+    left: "Num | BinOp"
+    right: "Num | BinOp"
+
+@dataclass(slots=True)
+class Print:
+    tag: ClassVar[str] = "print"
+    value: "Num | BinOp"
+
+# one shared Num per small integer literal
+SMALL_NUMS = tuple(Num(i) for i in range(-5, 257))
+
+def parse_factor(tokens, pos):
     """
     factor = <number> | "(" expression ")"
     """
-    token = tokens[0]
-    if token["tag"] == "number":
-        return {
-            "tag":"number",
-            "value": token["value"]
-        }, tokens[1:]
-    if token["tag"] == "(":
-        ast, tokens = parse_expression(tokens[1:])
-        assert tokens[0]["tag"] == ")"
-        return ast, tokens[1:]
-    raise Exception(f"Unexpected token '{token['tag']}' at position {token['position']}.")
+    if pos >= len(tokens):
+        raise Exception("Unexpected end of input.")
+    token = tokens[pos]
+    if token[TAG] == "number":
+        value = token[VALUE]
+        if type(value) is int and -5 <= value < 257:
+            return SMALL_NUMS[value + 5], pos + 1
+        return Num(value), pos + 1
+    if token[TAG] == "(":
+        # parse_expression opens and closes the parenthesis itself; a
+        # min_prec above every operator stops it right after the ")"
+        return parse_expression(tokens, pos, FACTOR_PREC)
+    raise Exception(f"Unexpected token '{token[TAG]}' at position {token[POS]}.")
 
 def test_parse_factor():
     """
@@ -54,94 +81,155 @@ def test_parse_factor():
     print("testing parse_factor()")
     for s in ["1","22","333"]:
         tokens = tokenize(s)
-        ast, tokens = parse_factor(tokens)
-        assert ast=={'tag': 'number', 'value': int(s)}
-        assert tokens[0]['tag'] == None 
+        ast, pos = parse_factor(tokens, 0)
+        assert ast==Num(int(s))
+        assert pos == len(tokens)
     for s in ["(1)","(22)"]:
         tokens = tokenize(s)
-        ast, tokens = parse_factor(tokens)
+        ast, pos = parse_factor(tokens, 0)
         s_n = s.replace("(","").replace(")","")
-        assert ast=={'tag': 'number', 'value': int(s_n)}
-        assert tokens[0]['tag'] == None 
+        assert ast==Num(int(s_n))
+        assert pos == len(tokens)
     tokens = tokenize("(2+3)")
-    ast, tokens = parse_factor(tokens)
-    assert ast == {'tag': '+', 'left': {'tag': 'number', 'value': 2}, 'right': {'tag': 'number', 'value': 3}}
+    ast, pos = parse_factor(tokens, 0)
+    assert ast == BinOp('+', Num(2), Num(3))
+    # small integers share one node; large ones and floats do not
+    assert parse_factor(tokenize("7"), 0)[0] is SMALL_NUMS[12]
+    assert parse_factor(tokenize("256"), 0)[0] is SMALL_NUMS[-1]
+    assert parse_factor(tokenize("257"), 0)[0] is not parse_factor(tokenize("257"), 0)[0]
+    ast1, _ = parse_factor(tokenize("1000"), 0)
+    ast2, _ = parse_factor(tokenize("1000"), 0)
+    assert ast1 == ast2 and ast1 is not ast2
+    ast, _ = parse_factor(tokenize("7.0"), 0)
+    assert type(ast.value) is float and ast is not SMALL_NUMS[12]
+    try:
+        parse_factor(tokenize(""), 0)
+        assert False, "Should have raised an error for empty input."
+    except Exception as e:
+        assert "Unexpected end of input" in str(e), f"Unexpected exception: {e}"
 
-def parse_term(tokens):
-    """
-    term = factor { "*"|"/" factor }
-    """
-    node, tokens = parse_factor(tokens)
-    while tokens[0]["tag"] in ["*","/"]:
-        tag = tokens[0]["tag"]
-        right_node, tokens = parse_factor(tokens[1:])
-        node = {"tag":tag, "left":node, "right":right_node}
+# binding power of each binary operator; higher binds tighter
+PREC = {
+    "+": 1,
+    "-": 1,
+    "*": 2,
+    "/": 2,
+}
 
-    return node, tokens
+# binds tighter than any operator, so no operator is taken
+FACTOR_PREC = max(PREC.values()) + 1
 
-def test_parse_term():
+def parse_expression(tokens, pos, min_prec=1):
     """
+    expression = term { "+"|"-" term }
     term = factor { "*"|"/" factor }
-    """
-    print("testing parse_term()")
-    for s in ["1","22","333"]:
-        tokens = tokenize(s)
-        ast, tokens = parse_term(tokens)
-        assert ast=={'tag': 'number', 'value': int(s)}
-        assert tokens[0]['tag'] == None 
-    tokens = tokenize("2*4")
-    ast, tokens = parse_term(tokens)
-    assert ast == {'tag': '*', 'left': {'tag': 'number', 'value': 2}, 'right': {'tag': 'number', 'value': 4}}
-    tokens = tokenize("2*4/6")
-    ast, tokens = parse_term(tokens)
-    assert ast == {'tag': '/', 'left': {'tag': '*', 'left': {'tag': 'number', 'value': 2}, 'right': {'tag': 'number', 'value': 4}}, 'right': {'tag': 'number', 'value': 6}}
 
-def parse_expression(tokens):
-    """
-    expression = term { "+"|"-" term }
+    Both levels are handled by one precedence-climbing loop over PREC.
+    Instead of recursing, pending operators and open parentheses are kept
+    on an explicit stack, so nesting depth is not limited by Python's
+    recursion limit.
     """
-    node, tokens = parse_term(tokens)
-    while tokens[0]["tag"] in ["+","-"]:
-        tag = tokens[0]["tag"]
-        right_node, tokens = parse_term(tokens[1:])
-        node = {"tag":tag, "left":node, "right":right_node}
-
-    return node, tokens
+    n = len(tokens)
+    # (min_prec, left, tag) for an operator waiting for its right operand,
+    # (min_prec, None, "(") for an open parenthesis
+    stack = []
+    while True:
+        while pos < n and tokens[pos][TAG] == "(":
+            stack.append((min_prec, None, "("))
+            min_prec = 1
+            pos += 1
+        node, pos = parse_factor(tokens, pos)
+        while True:
+            tag = tokens[pos][TAG] if pos < n else None
+            prec = PREC.get(tag, 0)
+            if prec >= min_prec:
+                break
+            # nothing binds at this level: close the innermost pending frame
+            if not stack:
+                return node, pos
+            min_prec, left, pending = stack.pop()
+            if pending == "(":
+                if tag is None:
+                    raise Exception("Unexpected end of input.")
+                if tag != ")":
+                    raise Exception(f"Expected ')' at position {tokens[pos][POS]}.")
+                pos += 1
+            else:
+                node = BinOp(pending, left, node)
+        stack.append((min_prec, node, tag))
+        # left-associative: the right operand only takes tighter operators
+        min_prec = prec + 1
+        pos += 1
 
 def test_parse_expression():
     """
     expression = term { "+"|"-" term }
+    term = factor { "*"|"/" factor }
     """
     print("testing parse_expression()")
     for s in ["1","22","333"]:
         tokens = tokenize(s)
-        ast, tokens = parse_expression(tokens)
-        assert ast=={'tag': 'number', 'value': int(s)}
-        assert tokens[0]['tag'] == None 
+        ast, pos = parse_expression(tokens, 0)
+        assert ast==Num(int(s))
+        assert pos == len(tokens)
     tokens = tokenize("2*4")
-    ast, tokens = parse_expression(tokens)
-    assert ast == {'tag': '*', 'left': {'tag': 'number', 'value': 2}, 'right': {'tag': 'number', 'value': 4}}
+    ast, pos = parse_expression(tokens, 0)
+    assert ast == BinOp('*', Num(2), Num(4))
+    tokens = tokenize("2*4/6")
+    ast, pos = parse_expression(tokens, 0)
+    assert ast == BinOp('/', BinOp('*', Num(2), Num(4)), Num(6))
+    tokens = tokenize("1-2-3")
+    ast, pos = parse_expression(tokens, 0)
+    assert ast == BinOp('-', BinOp('-', Num(1), Num(2)), Num(3))
+    tokens = tokenize("2*4+6")
+    ast, pos = parse_expression(tokens, 0)
+    assert ast == BinOp('+', BinOp('*', Num(2), Num(4)), Num(6))
     tokens = tokenize("1+2*4")
-    ast, tokens = parse_expression(tokens)
-    assert ast == {'tag': '+', 'left': {'tag': 'number', 'value': 1}, 'right': {'tag': '*', 'left': {'tag': 'number', 'value': 2}, 'right': {'tag': 'number', 'value': 4}}}
+    ast, pos = parse_expression(tokens, 0)
+    assert ast == BinOp('+', Num(1), BinOp('*', Num(2), Num(4)))
     tokens = tokenize("1+(2+3)*4")
-    ast, tokens = parse_expression(tokens)
-    assert ast == {'tag': '+', 'left': {'tag': 'number', 'value': 1}, 'right': {'tag': '*', 'left': {'tag': '+', 'left': {'tag': 'number', 'value': 2}, 'right': {'tag': 'number', 'value': 3}}, 'right': {'tag': 'number', 'value': 4}}}
+    ast, pos = parse_expression(tokens, 0)
+    assert ast == BinOp('+', Num(1), BinOp('*', BinOp('+', Num(2), Num(3)), Num(4)))
+    tokens = tokenize("((1+2)*(3-(4/5)))-6")
+    ast, pos = parse_expression(tokens, 0)
+    assert ast == BinOp('-', BinOp('*', BinOp('+', Num(1), Num(2)), BinOp('-', Num(3), BinOp('/', Num(4), Num(5)))), Num(6))
+    assert pos == len(tokens)
+    # nesting far deeper than the recursion limit
+    tokens = tokenize("(" * 5000 + "1" + ")" * 5000)
+    ast, pos = parse_expression(tokens, 0)
+    assert ast == Num(1) and pos == len(tokens)
+    tokens = tokenize("1-(" * 5000 + "2" + ")" * 5000)
+    ast, pos = parse_expression(tokens, 0)
+    assert pos == len(tokens)
+    for _ in range(5000):
+        assert ast.tag == "-" and ast.left == Num(1)
+        ast = ast.right
+    assert ast == Num(2)
+    for s in ["", "1+", "(1"]:
+        tokens = tokenize(s)
+        try:
+            parse_expression(tokens, 0)
+            assert False, f"Should have raised an error for {s!r}."
+        except Exception as e:
+            assert "Unexpected end of input" in str(e), f"Unexpected exception: {e}"
+    tokens = tokenize("(1 2")
+    try:
+        parse_expression(tokens, 0)
+        assert False, "Should have raised an error for an unclosed '('."
+    except Exception as e:
+        assert "Expected ')' at position 3" in str(e), f"Unexpected exception: {e}"
 
-def parse_statement(tokens):
+def parse_statement(tokens, pos):
     """
     statement = <print> expression | expression
     """
-    if tokens[0]["tag"] == "print":
-        value_ast, tokens = parse_expression(tokens[1:])
-        ast = {
-            'tag':'print',
-            'value': value_ast
-        }
+    if pos < len(tokens) and tokens[pos][TAG] == "print":
+        value_ast, pos = parse_expression(tokens, pos + 1)
+        ast = Print(value_ast)
 
     else:
-        ast, tokens = parse_expression(tokens)
-    return ast, tokens
+        ast, pos = parse_expression(tokens, pos)
+    return ast, pos
 
 def test_parse_statement():
     """
@@ -149,11 +237,11 @@ def test_parse_statement():
     """
     print("testing parse_statement()")
     tokens = tokenize("1+(2+3)*4")
-    ast, tokens = parse_statement(tokens)
-    assert ast == {'tag': '+', 'left': {'tag': 'number', 'value': 1}, 'right': {'tag': '*', 'left': {'tag': '+', 'left': {'tag': 'number', 'value': 2}, 'right': {'tag': 'number', 'value': 3}}, 'right': {'tag': 'number', 'value': 4}}}
+    ast, pos = parse_statement(tokens, 0)
+    assert ast == BinOp('+', Num(1), BinOp('*', BinOp('+', Num(2), Num(3)), Num(4)))
     tokens = tokenize("print 2*4")
-    ast, tokens = parse_statement(tokens)
-    assert ast == {'tag': 'print', 'value': {'tag': '*', 'left': {'tag': 'number', 'value': 2}, 'right': {'tag': 'number', 'value': 4}}}
+    ast, pos = parse_statement(tokens, 0)
+    assert ast == Print(BinOp('*', Num(2), Num(4)))
 
 
 
@@ -161,7 +249,7 @@ def parse(tokens):
     """
         program = expression
     """
-    ast, _ = parse_statement(tokens)
+    ast, _ = parse_statement(tokens, 0)
     return ast
 
 def test_parse():
@@ -170,7 +258,7 @@ def test_parse():
     """
     print("testing parse()")
     tokens = tokenize("1+(2+3)*4")
-    ast1, _ = parse_statement(tokens)
+    ast1, _ = parse_statement(tokens, 0)
     ast2 = parse(tokens)
     assert ast1 == ast2, "parse() is not evaluating via parse_expression()"
 
@@ -178,7 +266,6 @@ def test_parse():
 
 if __name__ == "__main__":
     test_parse_factor()
-    test_parse_term()
     test_parse_expression()
     test_parse_statement()
     test_parse()
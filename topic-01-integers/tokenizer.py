@@ -1,54 +1,98 @@
-import re
-
-# Define patterns for tokens
-patterns = [
-    [r"print","print"],
-    [r"\d*\.\d+|\d+\.\d*|\d+", "number"],
-    [r"[a-zA-Z_][a-zA-Z0-9_]*", "identifier"],  # identifiers
-    [r"\+", "+"],
-    [r"\-", "-"],
-    [r"\*", "*"],
-    [r"\/", "/"],
-    [r"\(", "("],
-    [r"\)", ")"],
-    [r"\s+","whitespace"],
-    [r".","error"]
-]
-
-for pattern in patterns:
-    pattern[0] = re.compile(pattern[0]) 
+import string
+import sys
+
+# The tokens recognized:
+#
+#   number      \d*\.\d+ | \d+\.\d* | \d+
+#   identifier  [a-zA-Z_][a-zA-Z0-9_]*, unless it is one of the KEYWORDS
+#   operators   + - * / ( )
+#   whitespace  \s+ (skipped)
+#
+# Anything else is a syntax error. Every token can be recognized from its
+# first character, so the lexer below is a hand-coded DFA driven by a
+# character-class table rather than a regex.
+
+# tokens are (tag, value, position) tuples; index them with these
+TAG, VALUE, POS = 0, 1, 2
+
+# identifiers that are reserved words, mapped to their tag
+KEYWORDS = {
+    "print": "print",
+}
+
+# single-character tokens, mapped from their character code to their
+# (interned) tag
+OP_TAGS = {ord(ch): sys.intern(ch) for ch in "+-*/()"}
+
+# character classes
+OTHER, DIGIT, DOT, ALPHA, SPACE, OPERATOR = 0, 1, 2, 3, 4, 5
+
+def char_class(ch):
+    if ch in string.digits:
+        return DIGIT
+    if ch == ".":
+        return DOT
+    if ch in string.ascii_letters or ch == "_":
+        return ALPHA
+    if ch in string.whitespace:
+        return SPACE
+    if ord(ch) in OP_TAGS:
+        return OPERATOR
+    return OTHER
+
+# read-only class of each character code, built once
+CLASS = bytes(char_class(chr(code)) for code in range(256))
 
 def tokenize(characters):
+    # only ASCII can form tokens; as bytes, indexing yields the character
+    # code directly and offsets are unchanged
+    try:
+        buffer = characters.encode("ascii")
+    except UnicodeEncodeError:
+        raise Exception("Syntax error") from None
+    end = len(buffer)
     tokens = []
     position = 0
-    while position < len(characters):
-        for pattern, tag in patterns:
-            match = pattern.match(characters, position)
-            if match:
-                break
-        assert match
-        # (process errors)
-        if tag == "error":
+    # locals are cheaper than globals and builtins inside the loop
+    table, op_tags, keywords = CLASS, OP_TAGS, KEYWORDS
+    append, _int, _float = tokens.append, int, float
+    digit, dot, alpha, space, operator = DIGIT, DOT, ALPHA, SPACE, OPERATOR
+    identifier_chars = (digit, alpha)
+    while position < end:
+        start = position
+        code = buffer[position]
+        kind = table[code]
+        if kind == space:
+            position += 1
+            while position < end and table[buffer[position]] == space:
+                position += 1
+        elif kind == operator:
+            tag = op_tags[code]
+            append((tag, tag, start))
+            position += 1
+        elif kind == digit or kind == dot:
+            while position < end and table[buffer[position]] == digit:
+                position += 1
+            is_float = position < end and table[buffer[position]] == dot
+            if is_float:
+                position += 1
+                while position < end and table[buffer[position]] == digit:
+                    position += 1
+                # a "." needs a digit on at least one side
+                if position - start == 1:
+                    raise Exception("Syntax error")
+            text = buffer[start:position]
+            # converted here rather than in a batched post-pass: without
+            # NumPy the second pass costs more than it saves
+            append(("number", _float(text) if is_float else _int(text), start))
+        elif kind == alpha:
+            position += 1
+            while position < end and table[buffer[position]] in identifier_chars:
+                position += 1
+            value = buffer[start:position].decode("ascii")
+            append((keywords.get(value, "identifier"), value, start))
+        else:
             raise Exception("Syntax error")
-        token = {
-            "tag":tag,
-            "position":position,
-            "value":match.group(0)
-        }
-        if token["tag"] == "number":
-            if "." in token["value"]:
-                token["value"] = float(token["value"])
-            else:
-                token["value"] = int(token["value"])
-        if token["tag"] != "whitespace":
-            tokens.append(token)
-        position = match.end()
-    # append end-of-stream marker
-    tokens.append({
-        "tag":None,
-        "value":None,
-        "position":position
-    })
     return tokens
 
 def test_simple_token():
@@ -56,33 +100,36 @@ def test_simple_token():
     examples = "+-*/()"
     for example in examples:
         t = tokenize(example)[0]
-        assert t["tag"] == example
-        assert t["position"] == 0
-        assert t["value"] == example
+        assert t[TAG] == example
+        assert t[POS] == 0
+        assert t[VALUE] == example
+        assert t[VALUE] is tokenize(example)[0][TAG]
 
 def test_number_token():
     print("test number tokens")
     for s in ["1","11"]:
         t = tokenize(s)
-        assert len(t) == 2
-        assert t[0]["tag"] == "number"
-        assert t[0]["value"] == int(s)
+        assert len(t) == 1
+        assert t[0][TAG] == "number"
+        assert t[0][VALUE] == int(s)
     for s in ["1.1","11.11","11.",".11"]:
         t = tokenize(s)
-        assert len(t) == 2
-        assert t[0]["tag"] == "number"
-        assert t[0]["value"] == float(s)
+        assert len(t) == 1
+        assert t[0][TAG] == "number"
+        assert t[0][VALUE] == float(s)
+    tokens = tokenize("1.2.3")
+    assert tokens == [('number', 1.2, 0), ('number', 0.3, 3)]
 
 
 def test_multiple_tokens():
     print("test multiple tokens")
     tokens = tokenize("1+2")
-    assert tokens == [{'tag': 'number', 'position': 0, 'value': 1}, {'tag': '+', 'position': 1, 'value': '+'}, {'tag': 'number', 'position': 2, 'value': 2}, {'tag': None, 'value': None, 'position': 3}]
+    assert tokens == [('number', 1, 0), ('+', '+', 1), ('number', 2, 2)]
 
 def test_whitespace():
     print("test whitespace...")
     tokens = tokenize("1 + 2")
-    assert tokens == [{'tag': 'number', 'position': 0, 'value': 1}, {'tag': '+', 'position': 2, 'value': '+'}, {'tag': 'number', 'position': 4, 'value': 2}, {'tag': None, 'value': None, 'position': 5}]
+    assert tokens == [('number', 1, 0), ('+', '+', 2), ('number', 2, 4)]
 
 def test_keywords():
     print("test keywords...")
@@ -90,17 +137,17 @@ def test_keywords():
         "print",
     ]:
         t = tokenize(keyword)
-        assert len(t) == 2
-        assert t[0]["tag"] == keyword, f"expected {keyword}, got {t[0]}"
+        assert len(t) == 1
+        assert t[0][TAG] == keyword, f"expected {keyword}, got {t[0]}"
         assert "value" not in t
 
 def test_identifier_tokens():
     print("test identifier tokens...")
-    for s in ["x", "y", "z", "alpha", "beta", "gamma"]:
+    for s in ["x", "y", "z", "alpha", "beta", "gamma", "printx", "prin", "_print"]:
         t = tokenize(s)
-        assert len(t) == 2
-        assert t[0]["tag"] == "identifier"
-        assert t[0]["value"] == s
+        assert len(t) == 1
+        assert t[0][TAG] == "identifier"
+        assert t[0][VALUE] == s
 
 
 
@@ -111,6 +158,17 @@ def test_error():
         assert False, "Should have raised an error for an invalid character."
     except Exception as e:
         assert "Syntax error" in str(e),f"Unexpected exception: {e}"
+    for s in [".", "1+.", "\u00e91"]:
+        try:
+            t = tokenize(s)
+            assert False, f"Should have raised an error for {s!r}."
+        except Exception as e:
+            assert "Syntax error" in str(e),f"Unexpected exception: {e}"
+    # the encode failure is an implementation detail, not part of the report
+    try:
+        tokenize("\u00e9")
+    except Exception as e:
+        assert e.__cause__ is None and e.__suppress_context__
 
 if __name__ == "__main__":
     test_simple_token()